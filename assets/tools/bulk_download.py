@@ -0,0 +1,206 @@
+"""
+Headless bulk version of the Spotify Preview Finder's "Download Preview".
+
+Downloads previews for a list of Spotify track IDs (or direct preview URLs),
+or for every track in a tracks.json, straight into assets/audio:
+
+    python bulk_download.py --tracks ../../data/tracks.json
+    python bulk_download.py 4uLU6hMCjMI75M1A2tKUQC 1a2b3c...
+
+Downloads run concurrently over one pooled HTTP session, resume from partial
+.part files, fetch each distinct URL once and never keep two files with the
+same contents. Spotify credentials are read from config.json, the same file
+the preview finder window saves them to.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from preview_download import CHUNK_SIZE, create_session, download_file
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIO_DIR = os.path.join(SCRIPT_DIR, "..", "audio")
+
+# Spotify's /tracks endpoint accepts at most 50 IDs per request
+SPOTIFY_BATCH = 50
+
+
+def load_credentials(path="config.json"):
+    with open(path, "r") as f:
+        creds = json.load(f)
+    return creds["client_id"], creds["client_secret"]
+
+
+def lookup_preview_urls(track_ids):
+    """Return {spotify track id: preview url} for the tracks that have a preview"""
+    import spotipy
+    from spotipy.oauth2 import SpotifyClientCredentials
+
+    client_id, client_secret = load_credentials()
+    auth_manager = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret)
+    spotify_client = spotipy.Spotify(auth_manager=auth_manager)
+
+    previews = {}
+    for start in range(0, len(track_ids), SPOTIFY_BATCH):
+        results = spotify_client.tracks(track_ids[start:start + SPOTIFY_BATCH])
+        for track in results["tracks"]:
+            if track and track.get("preview_url"):
+                previews[track["id"]] = track["preview_url"]
+    return previews
+
+
+def hash_file(filepath):
+    digest = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_existing_audio(audio_dir):
+    """Map content hash -> filename for the MP3s already in audio_dir"""
+    index = {}
+    for filename in sorted(os.listdir(audio_dir)):
+        if filename.endswith(".mp3"):
+            index.setdefault(hash_file(os.path.join(audio_dir, filename)), filename)
+    return index
+
+
+def build_jobs(args):
+    """
+    Return ({url: [filename, ...]}, tracks, tracks_path).
+
+    Tracks sharing a preview URL are grouped so the URL is fetched only once.
+    """
+    tracks, tracks_path = None, None
+    wanted = {}  # filename -> spotify id or url
+
+    if args.tracks:
+        tracks_path = args.tracks
+        with open(tracks_path, "r", encoding="utf-8") as f:
+            tracks = json.load(f)
+        for identifier, track in tracks.items():
+            if track.get("spotify"):
+                filename = os.path.basename(track.get("previewUrl", "")) or f"{identifier}.mp3"
+                wanted[filename] = track["spotify"]
+
+    for item in args.ids:
+        if item.startswith(("http://", "https://")):
+            filename = os.path.basename(item.split("?")[0]) or hashlib.sha1(item.encode()).hexdigest()
+            wanted[filename if filename.endswith(".mp3") else f"{filename}.mp3"] = item
+        else:
+            wanted[f"{item}.mp3"] = item
+
+    spotify_ids = sorted({v for v in wanted.values() if not v.startswith(("http://", "https://"))})
+    previews = lookup_preview_urls(spotify_ids) if spotify_ids else {}
+
+    jobs = {}
+    for filename, source in wanted.items():
+        url = source if source.startswith(("http://", "https://")) else previews.get(source)
+        if not url:
+            print(f"No preview available for {filename[:-4]} ({source})")
+            continue
+        if os.path.exists(os.path.join(args.output, filename)) and not args.force:
+            print(f"Already downloaded: {filename}")
+            continue
+        jobs.setdefault(url, []).append(filename)
+
+    return jobs, tracks, tracks_path
+
+
+def bulk_download(jobs, output_dir, workers=8):
+    """
+    Download every URL in jobs concurrently.
+
+    Returns {filename: filename actually holding its audio}; the two differ when
+    several filenames share one URL or the downloaded contents duplicate an
+    existing file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    known = index_existing_audio(output_dir)
+    placed = {}
+
+    session = create_session(pool_size=workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(download_file, url, os.path.join(output_dir, filenames[0]), session): (url, filenames)
+            for url, filenames in jobs.items()
+        }
+        for future in as_completed(futures):
+            url, filenames = futures[future]
+            first = filenames[0]
+            try:
+                digest = future.result()
+            except Exception as e:
+                print(f"Download failed: {first} ({url}): {e}")
+                continue
+
+            existing = known.get(digest)
+            if existing and existing != first:
+                os.remove(os.path.join(output_dir, first))
+                print(f"Duplicate of {existing}: {first}")
+                target = existing
+            else:
+                known[digest] = first
+                print(f"Downloaded: {first}")
+                target = first
+
+            for filename in filenames:
+                placed[filename] = target
+                if filename != target and filename != first:
+                    print(f"Same preview URL as {target}: {filename}")
+
+    session.close()
+    return placed
+
+
+def point_tracks_at_shared_files(tracks, tracks_path, placed):
+    """
+    Rewrite previewUrl for tracks whose audio turned out to be a duplicate, and
+    set it for tracks without one whose preview was saved as <identifier>.mp3
+    """
+    modified = False
+    for track_id, track in tracks.items():
+        filename = os.path.basename(track.get("previewUrl", ""))
+        if not filename and track.get("spotify"):
+            filename = f"{track_id}.mp3"
+        target = placed.get(filename)
+        if target and (target != filename or not track.get("previewUrl")):
+            track["previewUrl"] = f"/assets/audio/{target}"
+            modified = True
+            print(f"Updated {track_id}: previewUrl -> /assets/audio/{target}")
+
+    if modified:
+        with open(tracks_path, "w", encoding="utf-8") as f:
+            json.dump(tracks, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download Spotify previews in bulk into assets/audio.")
+    parser.add_argument("ids", nargs="*", help="Spotify track IDs or direct preview URLs")
+    parser.add_argument("--tracks", help="tracks.json to take Spotify IDs and filenames from")
+    parser.add_argument("--output", default=AUDIO_DIR, help="Destination folder (default: assets/audio)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads (default: 8)")
+    parser.add_argument("--force", action="store_true", help="Download again even if the file exists")
+    args = parser.parse_args()
+
+    if not args.ids and not args.tracks:
+        parser.error("give track IDs/URLs or --tracks")
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs, tracks, tracks_path = build_jobs(args)
+    placed = bulk_download(jobs, args.output, workers=args.workers)
+
+    if tracks is not None:
+        # Files skipped as already downloaded still need tracks pointing at them
+        present = {name: name for name in os.listdir(args.output) if name.endswith(".mp3")}
+        point_tracks_at_shared_files(tracks, tracks_path, {**present, **placed})
+
+    print(f"\nDone: {len(placed)} files in {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import webbrowser
 import json
 import os
 
+from preview_download import download_file
+
 class SpotifyApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -258,12 +260,7 @@ class SpotifyApp(tk.Tk):
             self.update_status("Downloading...", "white")
             self.update() 
 
-            response = requests.get(self.preview_url, stream=True)
-            response.raise_for_status() 
-
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            download_file(self.preview_url, filepath, resume=False)
             
             self.update_status("Download complete!", "#1DB954")
 
@@ -0,0 +1,106 @@
+"""
+Shared preview download code used by the Spotify Preview Finder window and the
+headless bulk downloader.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 256 * 1024
+
+
+def create_session(pool_size=8):
+    """Session whose connection pool can serve pool_size concurrent downloads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=3)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_resume_info(part_path, url):
+    """Return the validator saved for an unfinished download of url, or None if it is not resumable"""
+    try:
+        with open(part_path + ".json", "r") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if info.get("url") != url:
+        return None
+    return info.get("validator") or ""
+
+
+def save_resume_info(part_path, url, validator):
+    with open(part_path + ".json", "w") as f:
+        json.dump({"url": url, "validator": validator}, f)
+
+
+def resumes_at(response, offset):
+    """Whether a reply to "Range: bytes=<offset>-" fits the offset bytes already on disk"""
+    content_range = response.headers.get("Content-Range", "")
+    if response.status_code == 206:
+        match = re.match(r"bytes (\d+)-\d+/", content_range)
+        return bool(match) and int(match.group(1)) == offset
+    if response.status_code == 416:
+        # Only fine if the part file already holds exactly the whole file
+        match = re.match(r"bytes \*/(\d+)$", content_range)
+        return bool(match) and int(match.group(1)) == offset
+    return True
+
+
+def download_file(url, filepath, session=None, resume=True):
+    """
+    Stream url into filepath and return the SHA-1 hex digest of the contents.
+
+    Data is written to <filepath>.part first, with the URL and the server's
+    ETag/Last-Modified saved in <filepath>.part.json. If a partial file is left
+    over from an earlier run of the same URL, the download continues from where
+    it stopped with a Range/If-Range request. When the server sends the whole
+    file instead, or its reply does not line up with the bytes already on disk,
+    the part file is discarded and the download starts over.
+    """
+    http = session or requests
+    part_path = filepath + ".part"
+    offset = 0
+    validator = load_resume_info(part_path, url) if resume and os.path.exists(part_path) else None
+    if validator is not None:
+        offset = os.path.getsize(part_path)
+
+    headers = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if validator:
+            headers["If-Range"] = validator
+    response = http.get(url, headers=headers, stream=True, timeout=30)
+
+    if offset and not resumes_at(response, offset):
+        response.close()
+        offset = 0
+        response = http.get(url, stream=True, timeout=30)
+
+    with response:
+        if offset and response.status_code == 416:
+            # Range starts at the end of the file: the part file is already complete
+            pass
+        else:
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+            save_resume_info(part_path, url, response.headers.get("ETag") or response.headers.get("Last-Modified"))
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+
+    digest = hashlib.sha1()
+    with open(part_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    os.replace(part_path, filepath)
+    os.remove(part_path + ".json")
+    return digest.hexdigest()
@@ -0,0 +1,94 @@
+"""
+Local stand-in for the Spotify preview CDN, for trying out bulk_download.py
+without network access or credentials.
+
+Serves a folder of MP3s over HTTP with Range support:
+
+    python preview_test_server.py some/folder --port 8765
+    python bulk_download.py http://127.0.0.1:8765/track.mp3 --output /tmp/audio
+
+serve() can also be used from a script to run the server in the background.
+"""
+
+import argparse
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler without per-request logging"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RangeRequestHandler(QuietRequestHandler):
+    """
+    SimpleHTTPRequestHandler plus single-range "bytes=start-[end]" requests. An
+    If-Range that does not match the file's Last-Modified gets the whole file.
+    """
+
+    def do_GET(self):
+        match = RANGE_RE.match(self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().do_GET()
+
+        last_modified = self.date_time_string(os.stat(path).st_mtime)
+        if self.headers.get("If-Range", last_modified) != last_modified:
+            return super().do_GET()
+
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        if start >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.end_headers()
+            return
+
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            self.wfile.write(f.read(end - start + 1))
+
+
+def serve(directory, port=0, ranges=True):
+    """
+    Start serving directory in a background thread and return the server; port 0
+    picks a free one. With ranges=False, Range headers are ignored and whole files
+    are sent, like a CDN without range support.
+    """
+    handler_class = RangeRequestHandler if ranges else QuietRequestHandler
+    handler = partial(handler_class, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a folder of previews with HTTP Range support.")
+    parser.add_argument("directory", help="Folder to serve")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    handler = partial(RangeRequestHandler, directory=args.directory)
+    with ThreadingHTTPServer(("127.0.0.1", args.port), handler) as server:
+        print(f"Serving {os.path.abspath(args.directory)} at http://127.0.0.1:{args.port}/")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Tests for preview_download.py and bulk_download.py against the local stand-in
+server in preview_test_server.py. Run from this folder:
+
+    python -m unittest test_bulk_download
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+import requests
+
+from bulk_download import bulk_download, point_tracks_at_shared_files
+from preview_download import download_file, save_resume_info
+from preview_test_server import RangeRequestHandler, serve
+
+
+class ServerTestCase(unittest.TestCase):
+    ranges = True
+
+    def setUp(self):
+        self.served = tempfile.mkdtemp()
+        self.output = tempfile.mkdtemp()
+        self.server = self.start_server()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start_server(self):
+        return serve(self.served, ranges=self.ranges)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.served)
+        shutil.rmtree(self.output)
+
+    def publish(self, name, data):
+        with open(os.path.join(self.served, name), "wb") as f:
+            f.write(data)
+        return f"{self.base}/{name}"
+
+    def read(self, name):
+        with open(os.path.join(self.output, name), "rb") as f:
+            return f.read()
+
+    def seed_part(self, name, data, url, validator=None):
+        """Leave a partial download behind as an interrupted earlier run would"""
+        part_path = os.path.join(self.output, name + ".part")
+        with open(part_path, "wb") as f:
+            f.write(data)
+        if url:
+            save_resume_info(part_path, url, validator)
+
+
+class DownloadFileTest(ServerTestCase):
+    def test_resumes_partial_file_with_range_request(self):
+        data = os.urandom(300_000)
+        url = self.publish("a.mp3", data)
+        # Marked bytes instead of the real prefix show that only the rest was fetched
+        self.seed_part("a.mp3", b"x" * 123_457, url)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), b"x" * 123_457 + data[123_457:])
+        self.assertEqual(os.listdir(self.output), ["a.mp3"])
+
+    def test_resumes_when_if_range_matches(self):
+        data = os.urandom(300_000)
+        url = self.publish("a.mp3", data)
+        last_modified = requests.head(url).headers["Last-Modified"]
+        self.seed_part("a.mp3", b"x" * 1000, url, last_modified)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), b"x" * 1000 + data[1000:])
+
+    def test_changed_file_is_downloaded_again(self):
+        data = os.urandom(1000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", os.urandom(300), url, "Thu, 01 Jan 2015 00:00:00 GMT")
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+
+    def test_part_file_from_another_url_is_discarded(self):
+        data = os.urandom(1000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", os.urandom(300), url + "?old-preview")
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+
+    def test_part_file_without_resume_info_is_discarded(self):
+        data = os.urandom(1000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", os.urandom(300), None)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+
+    def test_complete_part_file_is_kept_on_416(self):
+        data = os.urandom(50_000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", data, url)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+        self.assertEqual(os.listdir(self.output), ["a.mp3"])
+
+    def test_part_file_longer_than_the_file_is_downloaded_again(self):
+        data = os.urandom(1000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", os.urandom(1500), url)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+
+
+class WrongOffsetHandler(RangeRequestHandler):
+    """Answers every range request from the start of the file"""
+
+    def do_GET(self):
+        if "Range" in self.headers:
+            del self.headers["Range"]
+            self.headers["Range"] = "bytes=0-"
+        super().do_GET()
+
+
+class WrongOffsetTest(ServerTestCase):
+    def start_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(WrongOffsetHandler, directory=self.served))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def test_range_reply_at_another_offset_restarts(self):
+        data = os.urandom(1000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", b"x" * 300, url)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+
+
+class DownloadWithoutRangesTest(ServerTestCase):
+    ranges = False
+
+    def test_restarts_when_server_ignores_range(self):
+        data = os.urandom(200_000)
+        url = self.publish("a.mp3", data)
+        self.seed_part("a.mp3", b"stale bytes that must not survive", url)
+
+        download_file(url, os.path.join(self.output, "a.mp3"))
+
+        self.assertEqual(self.read("a.mp3"), data)
+
+
+class BulkDownloadTest(ServerTestCase):
+    def test_deduplicates_by_url_and_content(self):
+        shared = os.urandom(80_000)
+        existing = os.urandom(60_000)
+        fresh = os.urandom(40_000)
+        with open(os.path.join(self.output, "existing.mp3"), "wb") as f:
+            f.write(existing)
+
+        jobs = {
+            self.publish("a.mp3", shared): ["a.mp3", "a-again.mp3"],
+            self.publish("b.mp3", shared): ["b.mp3"],
+            self.publish("c.mp3", existing): ["c.mp3"],
+            self.publish("d.mp3", fresh): ["d.mp3"],
+        }
+        # Seed a partial download so the bulk path resumes as well
+        self.seed_part("d.mp3", fresh[:15_000], f"{self.base}/d.mp3")
+
+        placed = bulk_download(jobs, self.output, workers=4)
+
+        # Same URL: one request, both names point at the same file
+        self.assertEqual(placed["a-again.mp3"], placed["a.mp3"])
+        # Same content under different URLs: only one copy survives
+        self.assertEqual(placed["a.mp3"], placed["b.mp3"])
+        self.assertIn(placed["a.mp3"], ("a.mp3", "b.mp3"))
+        # Content already on disk: the new download is dropped
+        self.assertEqual(placed["c.mp3"], "existing.mp3")
+        self.assertEqual(placed["d.mp3"], "d.mp3")
+
+        files = sorted(name for name in os.listdir(self.output))
+        self.assertEqual(files, sorted(["existing.mp3", placed["a.mp3"], "d.mp3"]))
+        self.assertEqual(self.read(placed["a.mp3"]), shared)
+        self.assertEqual(self.read("d.mp3"), fresh)
+
+    def test_rewrites_preview_urls_to_shared_files(self):
+        tracks = {
+            "one": {"previewUrl": "/assets/audio/one.mp3"},
+            "two": {"previewUrl": "/assets/audio/two.mp3"},
+            "three": {"previewUrl": "/assets/audio/three.mp3"},
+            "four": {"spotify": "4uLU6hMCjMI75M1A2tKUQC"},
+            "five": {"spotify": "1a2b3c"},
+            "six": {},
+        }
+        tracks_path = os.path.join(self.output, "tracks.json")
+        placed = {"one.mp3": "one.mp3", "two.mp3": "one.mp3", "four.mp3": "four.mp3", "five.mp3": "one.mp3"}
+
+        point_tracks_at_shared_files(tracks, tracks_path, placed)
+
+        with open(tracks_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved["one"]["previewUrl"], "/assets/audio/one.mp3")
+        self.assertEqual(saved["two"]["previewUrl"], "/assets/audio/one.mp3")
+        self.assertEqual(saved["three"]["previewUrl"], "/assets/audio/three.mp3")
+        # Tracks without a previewUrl get pointed at the file downloaded for them
+        self.assertEqual(saved["four"]["previewUrl"], "/assets/audio/four.mp3")
+        self.assertEqual(saved["five"]["previewUrl"], "/assets/audio/one.mp3")
+        self.assertNotIn("previewUrl", saved["six"])
+
+
+if __name__ == "__main__":
+    unittest.main()
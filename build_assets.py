@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Build stage that cuts the first-load weight of the pages:
+
+- subsets HeadingNowVariable.woff2 to the characters the site can display
+- bundles and minifies each page's stylesheets and scripts
+- inlines the CSS needed for the page's static markup and loads the rest async
+- writes everything under assets/dist with content hashes in the filenames
+
+Sources are left untouched; rewritten pages go to --output (default _build,
+which Jekyll ignores). The deploy workflow runs it with --output . on the
+checkout before building the site.
+
+Font subsetting needs fontTools (pip install fonttools brotli); without it the
+font is copied unchanged.
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import posixpath
+import re
+import string
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+# Pages whose <link>/<script> assets get bundled
+PAGES = ['tracks.html', 'festival.html']
+
+DIST_DIR = 'assets/dist'
+FONT_FILE = 'assets/fonts/HeadingNowVariable.woff2'
+
+LINK_RE = re.compile(r'[ \t]*<link\b[^>]*\brel=["\']stylesheet["\'][^>]*>\n?', re.IGNORECASE)
+SCRIPT_RE = re.compile(r'[ \t]*<script\b([^>]*)\bsrc=["\']([^"\']+)["\']([^>]*)>\s*</script>\n?', re.IGNORECASE)
+HREF_RE = re.compile(r'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+CSS_STRING_RE = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def local_path(url):
+    """Site-relative file path for a local URL, or None for external ones"""
+    if re.match(r'^(?:[a-z]+:)?//', url, re.IGNORECASE) or url.startswith('data:'):
+        return None
+    return url.split('?')[0].split('#')[0].lstrip('/')
+
+
+def write_hashed(output_root, stem, extension, data):
+    """Write data as assets/dist/<stem>.<hash>.<extension> and return its site path"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    digest = hashlib.sha1(data).hexdigest()[:10]
+    directory = os.path.join(output_root, DIST_DIR)
+    os.makedirs(directory, exist_ok=True)
+
+    # Drop outputs of earlier builds for the same bundle
+    for stale in glob.glob(os.path.join(directory, f'{stem}.*.{extension}')):
+        os.remove(stale)
+
+    filename = f'{stem}.{digest}.{extension}'
+    with open(os.path.join(directory, filename), 'wb') as f:
+        f.write(data)
+    print(f"Wrote {DIST_DIR}/{filename} ({len(data):,} bytes)")
+    return f'{DIST_DIR}/{filename}'
+
+
+# --- CSS -------------------------------------------------------------------
+
+def minify_css(css):
+    """Strip comments and redundant whitespace, leaving string contents alone"""
+    css = CSS_COMMENT_RE.sub('', css)
+    parts = CSS_STRING_RE.split(css)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[i])
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        # Only "prop: value" has a space after the colon; "a :hover" keeps its meaning
+        part = re.sub(r'([\w-])\s*:\s+', r'\1:', part)
+        parts[i] = part.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def split_css(css):
+    """Split minified CSS into top-level (prelude, body) blocks"""
+    blocks = []
+    depth = 0
+    start = 0
+    prelude = None
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:i]))
+                start = i + 1
+    return blocks
+
+
+def join_css(blocks):
+    return ''.join(f'{prelude}{{{body}}}' for prelude, body in blocks)
+
+
+def dedupe_blocks(blocks):
+    """Drop exact repeats of a rule; the last copy is kept so the cascade is unchanged"""
+    seen = set()
+    kept = []
+    for prelude, body in reversed(blocks):
+        if prelude.startswith(('@media', '@supports')):
+            body = join_css(dedupe_blocks(split_css(body)))
+        if (prelude, body) in seen:
+            continue
+        seen.add((prelude, body))
+        kept.append((prelude, body))
+    return kept[::-1]
+
+
+def rebase_urls(css, from_dir, to_dir):
+    """Rewrite relative url() references written for from_dir so they work from to_dir"""
+    def replace(match):
+        url = match.group(2)
+        if local_path(url) is None or url.startswith('/'):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(from_dir, url))
+        return f"url('{posixpath.relpath(target, to_dir or '.')}')"
+    return URL_RE.sub(replace, css)
+
+
+def page_selectors(html):
+    """Tag names, classes and ids present in a page's static markup"""
+    tags = set(m.lower() for m in re.findall(r'<([a-zA-Z][\w-]*)', html))
+    classes = set()
+    for value in re.findall(r'\bclass=["\']([^"\']*)["\']', html):
+        classes.update(value.split())
+    ids = set(re.findall(r'\bid=["\']([^"\']+)["\']', html))
+    return tags, classes, ids
+
+
+def selector_matches(selector, tags, classes, ids):
+    """True when every tag/class/id the selector names appears in the page"""
+    # Pseudo-classes, pseudo-elements and attribute tests cannot be judged statically
+    selector = re.sub(r'::?[\w-]+(\([^)]*\))?|\[[^\]]*\]', '', selector)
+    for name in re.findall(r'\.([\w-]+)', selector):
+        if name not in classes:
+            return False
+    for name in re.findall(r'#([\w-]+)', selector):
+        if name not in ids:
+            return False
+    for name in re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', selector):
+        if name.lower() not in tags:
+            return False
+    return True
+
+
+def critical_css(blocks, html):
+    """Rules that style elements present in the static HTML, plus the fonts they use"""
+    tags, classes, ids = page_selectors(html)
+    tags |= {'html', 'body'}
+    critical = []
+    for prelude, body in blocks:
+        if prelude.startswith('@font-face'):
+            critical.append((prelude, body))
+        elif prelude.startswith(('@media', '@supports')):
+            inner = critical_css(split_css(body), html)
+            if inner:
+                critical.append((prelude, join_css(inner)))
+        elif prelude.startswith('@'):
+            continue
+        elif prelude == ':root' or any(selector_matches(s, tags, classes, ids) for s in prelude.split(',')):
+            critical.append((prelude, body))
+
+    # Keyframes only when a critical rule animates with them
+    used = join_css(critical)
+    for prelude, body in blocks:
+        if prelude.startswith('@keyframes') and re.search(r'\b%s\b' % re.escape(prelude.split()[-1]), used):
+            critical.append((prelude, body))
+    return critical
+
+
+# --- JS --------------------------------------------------------------------
+
+# After these characters a "/" starts a regular expression rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def minify_js(source):
+    """
+    Remove comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    before. Whitespace is only collapsed in code: strings, template literals
+    (including multi-line ones) and regex literals are copied verbatim.
+    """
+    out = []
+    i = 0
+    n = len(source)
+    brace_depth = [0]  # one counter per open template `${`
+
+    def last_significant():
+        return ''.join(out[-16:]).rstrip()
+
+    def add_whitespace(newline):
+        # Collapse a run of whitespace to one space, or one line break if it spans lines
+        if newline:
+            while out and out[-1] == ' ':
+                out.pop()
+            if out and out[-1] != '\n':
+                out.append('\n')
+        elif out and out[-1] not in ' \n':
+            out.append(' ')
+
+    def regex_allowed():
+        previous = last_significant()
+        if previous.endswith(('++', '--')):
+            # i++ / 2 divides
+            return False
+        return (not previous or previous[-1] in REGEX_PRECEDERS
+                or re.search(r'(?<![\w$.])(return|typeof|case|do|else|in|of|void|yield|await)$', previous))
+
+    def regex_end(start):
+        # End of the regex literal at start, or None when the line ends first
+        # (a regex cannot span lines, so the "/" is a division after all)
+        j = start + 1
+        in_class = False
+        while j < n and (in_class or source[j] != '/'):
+            if source[j] in '\n\r\u2028\u2029':
+                return None
+            if source[j] == '\\':
+                j += 1
+            elif source[j] == '[':
+                in_class = True
+            elif source[j] == ']':
+                in_class = False
+            j += 1
+        return j + 1 if j < n else None
+
+    def copy_quoted(quote, start):
+        j = start + 1
+        while j < n and source[j] != quote:
+            j += 2 if source[j] == '\\' else 1
+        return j + 1
+
+    while i < n:
+        char = source[i]
+        nxt = source[i + 1] if i + 1 < n else ''
+
+        if char in '"\'':
+            end = copy_quoted(char, i)
+            out.append(source[i:end])
+            i = end
+        elif char == '`' or (char == '}' and len(brace_depth) > 1 and brace_depth[-1] == 0):
+            # Template literal text, either from its start or resuming after `${...}`
+            if char == '}':
+                brace_depth.pop()
+            j = i + 1
+            while j < n:
+                if source[j] == '\\':
+                    j += 2
+                elif source[j] == '`':
+                    j += 1
+                    break
+                elif source[j] == '$' and j + 1 < n and source[j + 1] == '{':
+                    j += 2
+                    brace_depth.append(0)
+                    break
+                else:
+                    j += 1
+            out.append(source[i:j])
+            i = j
+        elif char == '/' and nxt == '/':
+            while i < n and source[i] != '\n':
+                i += 1
+        elif char == '/' and nxt == '*':
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            add_whitespace('\n' in source[i:end])
+            i = end
+        elif char == '/' and regex_allowed() and regex_end(i):
+            end = regex_end(i)
+            out.append(source[i:end])
+            i = end
+        elif char.isspace():
+            add_whitespace(char in '\n\r\u2028\u2029')
+            i += 1
+        else:
+            if char == '{':
+                brace_depth[-1] += 1
+            elif char == '}':
+                brace_depth[-1] -= 1
+            out.append(char)
+            i += 1
+
+    while out and out[-1] in (' ', '\n'):
+        out.pop()
+    return ''.join(out) + '\n'
+
+
+# --- Fonts -----------------------------------------------------------------
+
+def collect_text(root):
+    """Every character the font may have to draw: page text, catalog data and UI strings"""
+    chars = set(string.printable)
+    for path in glob.glob(os.path.join(root, '*.html')) + glob.glob(os.path.join(root, 'patches', '*.html')):
+        chars.update(TAG_RE.sub(' ', read_text(path)))
+    for path in glob.glob(os.path.join(root, 'data', '*.json')):
+        chars.update(read_text(path))
+    for path in glob.glob(os.path.join(root, 'assets', 'js', '*.js')):
+        chars.update(read_text(path))
+    return ''.join(sorted(c for c in chars if c.isprintable()))
+
+
+def build_font(root, output_root):
+    """Write the (subset) font to assets/dist and return its site path"""
+    source = os.path.join(root, FONT_FILE)
+    stem = os.path.splitext(os.path.basename(FONT_FILE))[0]
+
+    if font_subset is None:
+        print("fontTools not installed, copying font without subsetting")
+        with open(source, 'rb') as f:
+            return write_hashed(output_root, stem, 'woff2', f.read())
+
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    font = font_subset.load_font(source, options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(text=collect_text(root))
+    subsetter.subset(font)
+
+    tmp_path = os.path.join(output_root, DIST_DIR, f'{stem}.tmp.woff2')
+    os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+    font_subset.save_font(font, tmp_path, options)
+    with open(tmp_path, 'rb') as f:
+        data = f.read()
+    os.remove(tmp_path)
+    print(f"Subset {FONT_FILE}: {os.path.getsize(source):,} -> {len(data):,} bytes")
+    return write_hashed(output_root, stem, 'woff2', data)
+
+
+# --- Pages -----------------------------------------------------------------
+
+def script_group(match):
+    """How a SCRIPT_RE match loads: a tuple of 'module', 'async' and 'defer'"""
+    attrs = match.group(1) + match.group(3)
+    group = ('module',) if re.search(r'type=["\']module["\']', attrs, re.IGNORECASE) else ()
+    return group + tuple(attr for attr in ('async', 'defer') if re.search(rf'\b{attr}\b', attrs, re.IGNORECASE))
+
+
+def build_page(root, output_root, page, font_path):
+    html = read_text(os.path.join(root, page))
+    page_dir = posixpath.dirname(page)
+    stem = os.path.splitext(os.path.basename(page))[0]
+    font_url = posixpath.relpath(font_path, page_dir or '.')
+
+    # Stylesheets, in document order and without repeats
+    links = LINK_RE.findall(html)
+    css_files = []
+    for tag in links:
+        href = HREF_RE.search(tag)
+        path = href and local_path(href.group(1))
+        if path and path not in css_files:
+            css_files.append(path)
+
+    css_parts = []
+    for path in css_files:
+        css = read_text(os.path.join(root, page_dir, path))
+        css_dir = posixpath.dirname(posixpath.normpath(posixpath.join(page_dir, path)))
+        # Bundles live in assets/dist, so rebase every relative url() onto it
+        css = rebase_urls(css, css_dir, DIST_DIR)
+        css_parts.append(css)
+    blocks = dedupe_blocks(split_css(minify_css('\n'.join(css_parts))))
+    bundle_css = join_css(blocks).replace(
+        posixpath.relpath(FONT_FILE, DIST_DIR), posixpath.relpath(font_path, DIST_DIR))
+
+    # Scripts: only scripts that load the same way (classic or module, blocking,
+    # defer or async) share a bundle, so their execution order is unchanged
+    scripts = {}
+    for match in SCRIPT_RE.finditer(html):
+        path = local_path(match.group(2))
+        if path is None:
+            continue
+        paths = scripts.setdefault(script_group(match), [])
+        if path not in paths:
+            paths.append(path)
+
+    script_tags = {}
+    for group, paths in scripts.items():
+        source = ''.join(minify_js(read_text(os.path.join(root, page_dir, p))) for p in paths)
+        bundle = write_hashed(output_root, '-'.join((stem,) + group), 'js', source)
+        url = posixpath.relpath(bundle, page_dir or '.')
+        attrs = ''.join(f' {attr}' for attr in group if attr != 'module')
+        script_tags[group] = (f'<script type="module" src="{url}"{attrs}></script>' if 'module' in group
+                              else f'<script src="{url}"{attrs}></script>')
+
+    # Rewrite the page: critical CSS inline, full bundle preloaded, one tag per script bundle
+    if css_files:
+        bundle = write_hashed(output_root, stem, 'css', bundle_css)
+        bundle_url = posixpath.relpath(bundle, page_dir or '.')
+        critical = rebase_urls(join_css(critical_css(blocks, html)), DIST_DIR, page_dir)
+        critical = critical.replace(posixpath.relpath(FONT_FILE, page_dir or '.'), font_url)
+        head = ''
+        if posixpath.basename(font_path) in bundle_css:
+            head += f'    <link rel="preload" href="{font_url}" as="font" type="font/woff2" crossorigin>\n'
+        head += (
+            f'    <style>{critical}</style>\n'
+            f'    <link rel="preload" href="{bundle_url}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+            f'    <noscript><link rel="stylesheet" href="{bundle_url}"></noscript>\n'
+        )
+        first = True
+
+        def replace_link(match):
+            nonlocal first
+            href = HREF_RE.search(match.group(0))
+            if not (href and local_path(href.group(1))):
+                return match.group(0)
+            if first:
+                first = False
+                return head
+            return ''
+        html = LINK_RE.sub(replace_link, html)
+
+    placed = set()
+
+    def replace_script(match):
+        if local_path(match.group(2)) is None:
+            return match.group(0)
+        group = script_group(match)
+        if group in placed:
+            return ''
+        placed.add(group)
+        indent = re.match(r'[ \t]*', match.group(0)).group(0)
+        return f'{indent}{script_tags[group]}\n'
+    html = SCRIPT_RE.sub(replace_script, html)
+
+    output_page = os.path.join(output_root, page)
+    os.makedirs(os.path.dirname(output_page) or '.', exist_ok=True)
+    with open(output_page, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"Built {page}")
+
+
+def page_weight(html, base):
+    """Bytes of the page plus the local CSS and JS it references"""
+    urls = [m.group(1) for m in map(HREF_RE.search, LINK_RE.findall(html)) if m]
+    urls += [m.group(2) for m in SCRIPT_RE.finditer(html)]
+    urls += re.findall(r'<link rel="preload" href="([^"]+)" as="style"', html)
+    total = len(html.encode('utf-8'))
+    for path in {local_path(url) for url in urls} - {None}:
+        if os.path.exists(os.path.join(base, path)):
+            total += os.path.getsize(os.path.join(base, path))
+    return total
+
+
+def report(root, output_root):
+    """Compare what each page fetches before and after the build (fonts and images aside)"""
+    for page in PAGES:
+        before = page_weight(read_text(os.path.join(root, page)), root)
+        after = page_weight(read_text(os.path.join(output_root, page)), output_root)
+        print(f"{page}: {before:,} -> {after:,} bytes of HTML/CSS/JS (uncompressed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subset fonts and bundle/minify page CSS and JS.")
+    parser.add_argument('--root', default='.', help="Site root (default: current directory)")
+    parser.add_argument('--output', default='_build', help="Where rewritten pages and assets/dist go (default: _build)")
+    args = parser.parse_args()
+
+    font_path = build_font(args.root, args.output)
+    for page in PAGES:
+        build_page(args.root, args.output, page, font_path)
+
+    if os.path.abspath(args.root) != os.path.abspath(args.output):
+        report(args.root, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate audio and preview videos, such as stale re-encodes left
+next to their replacements (1999old.mp4 / 1999.mp4), that byte comparisons miss.
+
+Audio gets a chroma + spectral-band fingerprint, videos get tiny difference
+hashes of a few sparse frames. Each file is reduced to one SimHash signature
+and bucketed with locality sensitive hashing, so only files sharing a bucket
+are compared.
+
+Requires ffmpeg on the PATH and numpy.
+"""
+
+import argparse
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from find_orphans import collect_source_references, collect_track_references, format_size, is_referenced
+
+AUDIO_DIR = 'assets/audio'
+VIDEO_DIR = 'assets/preview'
+AUDIO_EXTENSIONS = ('.mp3', '.ogg', '.wav')
+VIDEO_EXTENSIONS = ('.mp4', '.webm')
+
+# Audio analysis
+AUDIO_RATE = 11025
+FRAME_SIZE = 4096
+TIME_SEGMENTS = 16
+SPECTRAL_BANDS = 16
+AUDIO_SIMILARITY = 0.95
+
+# Video analysis: one 9x8 grayscale frame every VIDEO_FRAME_STEP seconds
+VIDEO_FRAME_STEP = 2
+VIDEO_MAX_FRAMES = 32
+VIDEO_MAX_DISTANCE = 10  # mean Hamming distance (of 64 bits) between matched frames
+
+# LSH: one SimHash signature per file, split into bands; sharing any band makes a
+# candidate pair. Video signatures are longer because a near-duplicate video
+# differs in more bits than a near-duplicate audio vector.
+AUDIO_SIGNATURE_BITS = 64
+VIDEO_SIGNATURE_BITS = 128
+BAND_BITS = 8
+
+
+def run_ffmpeg(args):
+    result = subprocess.run(['ffmpeg', '-v', 'error'] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
+
+
+def pitch_class_matrix():
+    """(bins x 12) matrix folding FFT bins between 55 Hz and 5 kHz onto pitch classes"""
+    freqs = np.fft.rfftfreq(FRAME_SIZE, 1 / AUDIO_RATE)
+    matrix = np.zeros((len(freqs), 12))
+    audible = (freqs >= 55) & (freqs <= 5000)
+    pitch = np.round(12 * np.log2(freqs[audible] / 440.0)).astype(int) % 12
+    matrix[np.flatnonzero(audible), pitch] = 1
+    return matrix
+
+
+def band_matrix():
+    """(bins x SPECTRAL_BANDS) matrix summing FFT bins into log-spaced bands"""
+    freqs = np.fft.rfftfreq(FRAME_SIZE, 1 / AUDIO_RATE)
+    edges = np.geomspace(40, AUDIO_RATE / 2, SPECTRAL_BANDS + 1)
+    band = np.searchsorted(edges, freqs, side='right') - 1
+    matrix = np.zeros((len(freqs), SPECTRAL_BANDS))
+    valid = (band >= 0) & (band < SPECTRAL_BANDS)
+    matrix[np.flatnonzero(valid), band[valid]] = 1
+    return matrix
+
+
+def audio_fingerprint(path):
+    """Unit vector of chroma and band energy averaged over TIME_SEGMENTS slices of the track"""
+    samples = np.frombuffer(
+        run_ffmpeg(['-i', path, '-f', 's16le', '-ac', '1', '-ar', str(AUDIO_RATE), '-']),
+        dtype=np.int16,
+    )
+    frame_count = len(samples) // FRAME_SIZE
+    if frame_count < TIME_SEGMENTS:
+        return None
+
+    frames = samples[:frame_count * FRAME_SIZE].reshape(frame_count, FRAME_SIZE) * np.hanning(FRAME_SIZE)
+    spectrum = np.abs(np.fft.rfft(frames, axis=1))
+
+    features = np.hstack([spectrum @ pitch_class_matrix(), np.log1p(spectrum @ band_matrix())])
+    # Normalize each frame so loudness differences between encodes do not matter
+    features /= np.linalg.norm(features, axis=1, keepdims=True) + 1e-9
+
+    usable = frame_count - frame_count % TIME_SEGMENTS
+    segments = features[:usable].reshape(TIME_SEGMENTS, -1, features.shape[1]).mean(axis=1)
+    vector = segments.ravel()
+    vector -= vector.mean()
+    return vector / (np.linalg.norm(vector) + 1e-9)
+
+
+def video_fingerprint(path):
+    """64-bit difference hashes of sparse frames, as a uint64 array"""
+    raw = run_ffmpeg([
+        '-i', path, '-frames:v', str(VIDEO_MAX_FRAMES),
+        '-vf', f'fps=1/{VIDEO_FRAME_STEP},scale=9:8,format=gray',
+        '-f', 'rawvideo', '-',
+    ])
+    frames = np.frombuffer(raw, dtype=np.uint8)
+    if len(frames) < 72:
+        return None
+    frames = frames[:len(frames) // 72 * 72].reshape(-1, 8, 9).astype(np.int16)
+    bits = (frames[:, :, 1:] > frames[:, :, :-1]).reshape(-1, 64)
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def fingerprint(job):
+    """Worker: (kind, path) -> (kind, path, fingerprint or None)"""
+    kind, path = job
+    try:
+        if kind == 'audio':
+            return kind, path, audio_fingerprint(path)
+        return kind, path, video_fingerprint(path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not fingerprint {path}: {e}")
+        return kind, path, None
+
+
+def simhash(vector, planes):
+    """Project onto random hyperplanes and keep the signs as an integer (one bit per plane)"""
+    bits = (planes @ vector) > 0
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def video_vector(frame_hashes):
+    """
+    Concatenate frame hash bits as +1/-1 into one fixed-length vector.
+
+    Flat frames (black intros, fades) carry no information and would make
+    unrelated videos look alike, so they contribute zeros, as does padding.
+    """
+    bits = np.unpackbits(frame_hashes.astype('>u8').view(np.uint8).reshape(-1, 8), axis=1)
+    signs = bits.astype(np.float64) * 2 - 1
+    signs[(bits.min(axis=1) == bits.max(axis=1))] = 0
+    vector = np.zeros(VIDEO_MAX_FRAMES * 64)
+    vector[:signs.size] = signs.ravel()[:vector.size]
+    return vector
+
+
+def lsh_planes():
+    """Fixed random hyperplanes for the audio and video SimHash, in that order"""
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal((AUDIO_SIGNATURE_BITS, TIME_SEGMENTS * (12 + SPECTRAL_BANDS)))
+    video = rng.standard_normal((VIDEO_SIGNATURE_BITS, VIDEO_MAX_FRAMES * 64))
+    return audio, video
+
+
+def band_keys(signature, bits):
+    """Split a signature into (band index, band value) bucket keys"""
+    mask = (1 << BAND_BITS) - 1
+    return [(band, (signature >> (band * BAND_BITS)) & mask) for band in range(bits // BAND_BITS)]
+
+
+def hamming(a, b):
+    """Element-wise popcount of a ^ b for uint64 arrays"""
+    x = np.bitwise_xor(a, b)
+    return np.unpackbits(x.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def audio_match(a, b):
+    return float(a @ b) >= AUDIO_SIMILARITY
+
+
+def video_match(a, b):
+    n = min(len(a), len(b))
+    return hamming(a[:n], b[:n]).mean() <= VIDEO_MAX_DISTANCE
+
+
+def candidate_pairs(fingerprints):
+    """Use LSH buckets to pick the pairs worth comparing"""
+    audio_planes, video_planes = lsh_planes()
+    buckets = {}
+    for index, (kind, _, fp) in enumerate(fingerprints):
+        if kind == 'audio':
+            bits = AUDIO_SIGNATURE_BITS
+            signature = simhash(fp, audio_planes)
+        else:
+            bits = VIDEO_SIGNATURE_BITS
+            signature = simhash(video_vector(fp), video_planes)
+        # An all-zero signature means no usable content (e.g. a video of flat frames)
+        if signature == 0:
+            continue
+        for key in band_keys(signature, bits):
+            buckets.setdefault((kind,) + key, set()).add(index)
+
+    pairs = set()
+    for members in buckets.values():
+        members = sorted(members)
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b))
+    return pairs
+
+
+def cluster(count, pairs):
+    """Union-find over matched pairs; returns lists of indexes with 2+ members"""
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+
+    groups = {}
+    for i in range(count):
+        groups.setdefault(find(i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def find_duplicates(root='.'):
+    """Return [(kept path, [(duplicate path, size), ...])] for every duplicate cluster"""
+    jobs = []
+    for kind, folder, extensions in (('audio', AUDIO_DIR, AUDIO_EXTENSIONS), ('video', VIDEO_DIR, VIDEO_EXTENSIONS)):
+        directory = os.path.join(root, folder)
+        if os.path.isdir(directory):
+            jobs.extend((kind, os.path.join(directory, name)) for name in sorted(os.listdir(directory))
+                        if name.lower().endswith(extensions))
+
+    with ProcessPoolExecutor() as pool:
+        fingerprints = [result for result in pool.map(fingerprint, jobs) if result[2] is not None]
+
+    matches = set()
+    for a, b in candidate_pairs(fingerprints):
+        kind, _, fp_a = fingerprints[a]
+        fp_b = fingerprints[b][2]
+        if (audio_match if kind == 'audio' else video_match)(fp_a, fp_b):
+            matches.add((a, b))
+
+    identifiers, track_assets = collect_track_references(root)
+    source_refs = collect_source_references(root)
+
+    def keep_priority(path):
+        # Prefer the copy the site uses, then the most recently modified one
+        relpath = os.path.relpath(path, root).replace(os.sep, '/')
+        return (is_referenced(relpath, identifiers, source_refs, track_assets), os.path.getmtime(path))
+
+    clusters = []
+    for members in cluster(len(fingerprints), matches):
+        paths = sorted((fingerprints[i][1] for i in members), key=keep_priority, reverse=True)
+        clusters.append((paths[0], [(path, os.path.getsize(path)) for path in paths[1:]]))
+    return clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report clusters of near-duplicate audio and preview videos.")
+    parser.add_argument('--root', default='.', help="Site root (default: current directory)")
+    args = parser.parse_args()
+
+    clusters = find_duplicates(args.root)
+    total = 0
+    for kept, duplicates in clusters:
+        print(f"\nKeep {os.path.relpath(kept, args.root)}")
+        for path, size in duplicates:
+            total += size
+            print(f"  {format_size(size):>10}  {os.path.relpath(path, args.root)}")
+
+    print(f"\n{len(clusters)} duplicate clusters, {format_size(total)} reclaimable")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Find song pages and media assets that nothing references anymore.
+Run this script before a deploy to see how much dead weight the site carries,
+and with --prune to delete it.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Files whose contents can reference other files
+SOURCE_PATTERNS = ['*.html', 'patches/*.html', 'assets/js/*.js', 'assets/css/*.css', 'scripts/*.js', 'data/*.json']
+
+# Folders whose files are only kept alive by references
+ASSET_DIRS = ['assets/audio', 'assets/covers', 'assets/images', 'assets/midis', 'assets/preview']
+
+# Track fields that hold a bare filename or a path to an asset
+TRACK_ASSET_FIELDS = {
+    'cover': 'assets/covers',
+    'videoUrl': 'assets/preview',
+    'previewUrl': 'assets/audio',
+    'waveform': 'assets/audio',
+}
+
+# One pass per file picks up every path-looking token with a known extension
+REFERENCE_RE = re.compile(
+    r'[\w./%-]+?\.(?:png|jpe?g|gif|svg|webp|ico|mp4|webm|mp3|ogg|wav|mid|woff2?|css|js|json|html)\b',
+    re.IGNORECASE,
+)
+
+
+def load_json_file(filepath):
+    """Load JSON file safely"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading {filepath}: {e}")
+        return None
+
+
+def extract_references(filepath):
+    """Return every referenced filename (basename) found in a source file"""
+    try:
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+    except OSError as e:
+        print(f"Error reading {filepath}: {e}")
+        return set()
+
+    return {os.path.basename(match) for match in REFERENCE_RE.findall(text)}
+
+
+def collect_source_references(root):
+    """Scan all HTML/JS/CSS/JSON sources in parallel and merge their references"""
+    files = []
+    for pattern in SOURCE_PATTERNS:
+        files.extend(glob.glob(os.path.join(root, pattern)))
+
+    references = set()
+    with ThreadPoolExecutor() as pool:
+        for found in pool.map(extract_references, files):
+            references.update(found)
+    return references
+
+
+def collect_track_references(root):
+    """Collect track identifiers and asset filenames from every tracks*.json snapshot"""
+    identifiers = set()
+    assets = set()
+
+    for snapshot in sorted(glob.glob(os.path.join(root, 'data', 'tracks*.json'))):
+        tracks = load_json_file(snapshot)
+        if not isinstance(tracks, dict):
+            continue
+
+        for identifier, track in tracks.items():
+            identifiers.add(identifier)
+            if not isinstance(track, dict):
+                continue
+            if track.get('urlId'):
+                identifiers.add(track['urlId'])
+            for field, folder in TRACK_ASSET_FIELDS.items():
+                value = track.get(field)
+                if value:
+                    assets.add(f"{folder}/{os.path.basename(value)}")
+
+    return identifiers, assets
+
+
+def is_referenced(relpath, identifiers, source_refs, track_assets):
+    """Decide whether an asset file is still in use"""
+    if relpath in track_assets:
+        return True
+
+    # Any page, script or data file naming the file keeps it, whatever its folder;
+    # a false positive only costs disk space, a false negative deletes a live asset
+    name = os.path.basename(relpath)
+    if name in source_refs:
+        return True
+
+    folder = os.path.dirname(relpath)
+
+    # Charts are published as <identifier>-v<N>.mid
+    if folder == 'assets/midis':
+        return name.rsplit('-v', 1)[0] in identifiers
+
+    return False
+
+
+def find_orphans(root='.'):
+    """Return (orphan_pages, orphan_assets) as lists of (relative path, size in bytes)"""
+    root = Path(root)
+    identifiers, track_assets = collect_track_references(root)
+    source_refs = collect_source_references(root)
+
+    orphan_pages = []
+    for page in sorted((root / 'songs').glob('*.html')):
+        if page.stem not in identifiers:
+            orphan_pages.append((page.relative_to(root).as_posix(), page.stat().st_size))
+
+    orphan_assets = []
+    for folder in ASSET_DIRS:
+        for asset in sorted((root / folder).glob('*')):
+            if not asset.is_file():
+                continue
+            relpath = asset.relative_to(root).as_posix()
+            if not is_referenced(relpath, identifiers, source_refs, track_assets):
+                orphan_assets.append((relpath, asset.stat().st_size))
+
+    return orphan_pages, orphan_assets
+
+
+def format_size(num_bytes):
+    """Human readable byte count"""
+    for unit in ('B', 'KB', 'MB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def print_report(title, entries):
+    """Print one section of the report and return its total size"""
+    total = sum(size for _, size in entries)
+    print(f"\n{title}: {len(entries)} files, {format_size(total)}")
+    for relpath, size in entries:
+        print(f"  {format_size(size):>10}  {relpath}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report (and optionally delete) unreferenced song pages and assets.")
+    parser.add_argument('--root', default='.', help="Site root (default: current directory)")
+    parser.add_argument('--prune', action='store_true', help="Delete the orphaned files after reporting them")
+    args = parser.parse_args()
+
+    orphan_pages, orphan_assets = find_orphans(args.root)
+
+    total = print_report("Orphaned song pages", orphan_pages)
+    total += print_report("Orphaned assets", orphan_assets)
+    print(f"\nTotal reclaimable: {format_size(total)}")
+
+    if args.prune:
+        for relpath, _ in orphan_pages + orphan_assets:
+            os.remove(os.path.join(args.root, relpath))
+        print(f"Deleted {len(orphan_pages) + len(orphan_assets)} files.")
+    elif orphan_pages or orphan_assets:
+        print("Run again with --prune to delete them.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,33 @@
 #!/usr/bin/env python3
 """
 Generate individual HTML pages for each song to enable proper Discord embeds.
-Run this script whenever tracks.json is updated.
+Run this script whenever tracks.json is updated, or run it with --watch to
+regenerate only the affected pages as tracks.json and the assets change.
 """
 
+import argparse
+import ctypes
+import ctypes.util
 import json
 import os
+import select
+import struct
+import sys
+import time
 from pathlib import Path
 
-def generate_song_pages():
-    # Read tracks data
-    with open('data/tracks.json', 'r', encoding='utf-8') as f:
-        tracks = json.load(f)
-    
-    # Create songs directory if it doesn't exist
-    songs_dir = Path('songs')
-    songs_dir.mkdir(exist_ok=True)
-    
-    # HTML template for each song
-    template = '''<!DOCTYPE html>
+TRACKS_FILE = 'data/tracks.json'
+SONGS_DIR = Path('songs')
+
+# Folders whose files feed into pages or derived data
+WATCHED_ASSET_DIRS = ['assets/audio', 'assets/covers', 'assets/midis']
+
+# Quiet period that ends a burst of file events (editors often write several times)
+DEBOUNCE_SECONDS = 0.1
+POLL_INTERVAL = 0.25
+
+# HTML template for each song
+TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -47,46 +56,295 @@ def generate_song_pages():
     <p>Redirecting to <a href="../tracks.html#{identifier}">{title} - {artist}</a>...</p>
 </body>
 </html>'''
-    
+
+
+def load_tracks():
+    with open(TRACKS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_song_page(identifier, track):
+    """Render one track's page into songs/<identifier>.html"""
+    title = track.get('title', 'Unknown')
+    artist = track.get('artist', 'Unknown')
+    genre = track.get('genre', 'Music')
+    duration = track.get('duration', 'N/A')
+    release_year = track.get('releaseYear', 'N/A')
+    cover = track.get('cover', '')
+
+    # Create description
+    description = f"{genre} • {duration} • {release_year}"
+
+    # Image URL
+    if cover:
+        image_url = f"https://hiteriavillage.github.io/assets/covers/{cover}"
+    else:
+        image_url = "https://hiteriavillage.github.io/assets/images/logo.png"
+
+    # Generate HTML
+    html = TEMPLATE.format(
+        identifier=identifier,
+        title=title,
+        artist=artist,
+        description=description,
+        image_url=image_url,
+        release_year=release_year
+    )
+
+    # Write to file
+    output_file = SONGS_DIR / f"{identifier}.html"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    print(f"Generated: {output_file}")
+
+
+def generate_song_pages():
+    # Read tracks data
+    tracks = load_tracks()
+
+    # Create songs directory if it doesn't exist
+    SONGS_DIR.mkdir(exist_ok=True)
+
     # Generate a page for each track
     for identifier, track in tracks.items():
-        title = track.get('title', 'Unknown')
-        artist = track.get('artist', 'Unknown')
-        genre = track.get('genre', 'Music')
-        duration = track.get('duration', 'N/A')
-        release_year = track.get('releaseYear', 'N/A')
-        cover = track.get('cover', '')
-        
-        # Create description
-        description = f"{genre} • {duration} • {release_year}"
-        
-        # Image URL
-        if cover:
-            image_url = f"https://hiteriavillage.github.io/assets/covers/{cover}"
-        else:
-            image_url = "https://hiteriavillage.github.io/assets/images/logo.png"
-        
-        # Generate HTML
-        html = template.format(
-            identifier=identifier,
-            title=title,
-            artist=artist,
-            description=description,
-            image_url=image_url,
-            release_year=release_year
-        )
-        
-        # Write to file
-        output_file = songs_dir / f"{identifier}.html"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        print(f"Generated: {output_file}")
-    
+        write_song_page(identifier, track)
+
     print(f"\nTotal songs generated: {len(tracks)}")
     print("\nNow you can share links like:")
     print("https://hiteriavillage.github.io/songs/crazy.html")
     print("\nThese will show proper embeds on Discord and redirect users to the main page.")
 
+
+class InotifyWatcher:
+    """Minimal inotify binding (Linux only) reporting changed paths"""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, directories):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify is not available on this platform")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init failed")
+
+        self.mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        self.directories = {}
+        # Folders that do not exist yet; their nearest existing parent is watched
+        # until they appear
+        self.pending = [directory for directory in directories if not os.path.isdir(directory)]
+        self.parents = {}
+        for directory in directories:
+            if os.path.isdir(directory):
+                self.directories[self.add_watch(directory)] = directory
+        self.watch_pending()
+
+    def add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        return wd
+
+    def watch_pending(self):
+        """Start watching pending folders that now exist; return the files already in them"""
+        appeared = set()
+        for directory in list(self.pending):
+            if os.path.isdir(directory):
+                self.pending.remove(directory)
+                self.directories[self.add_watch(directory)] = directory
+                print(f"Now watching {directory}")
+                appeared.update(entry.path for entry in os.scandir(directory) if entry.is_file())
+                continue
+            parent = os.path.dirname(directory)
+            while parent and not os.path.isdir(parent):
+                parent = os.path.dirname(parent)
+            parent = parent or '.'
+            if parent not in self.parents.values() and parent not in self.directories.values():
+                self.parents[self.add_watch(parent)] = parent
+        return appeared
+
+    def wait(self, timeout=None):
+        """Block until events arrive (or timeout) and return the set of changed paths"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            if wd in self.directories and name:
+                changed.add(os.path.join(self.directories[wd], name))
+        if self.pending:
+            changed |= self.watch_pending()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback that compares modification times of every watched file"""
+
+    def __init__(self, directories):
+        self.directories = directories
+        self.snapshot = self.scan()
+
+    def scan(self):
+        state = {}
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if entry.is_file():
+                    stat = entry.stat()
+                    state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.scan()
+            changed = {path for path in current.keys() | self.snapshot.keys()
+                       if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        pass
+
+
+def changed_track_ids(old_tracks, new_tracks):
+    """Identifiers whose track data was added or edited"""
+    return {identifier for identifier, track in new_tracks.items() if old_tracks.get(identifier) != track}
+
+
+def tracks_using_asset(tracks, path):
+    """Identifiers of the tracks that reference the asset at path"""
+    folder, name = os.path.split(path)
+    folder = folder.replace(os.sep, '/')
+    stem = os.path.splitext(name)[0]
+    matches = set()
+    for identifier, track in tracks.items():
+        if folder == 'assets/covers' and track.get('cover') == name:
+            matches.add(identifier)
+        elif folder == 'assets/audio' and os.path.basename(track.get('previewUrl', '')) == name:
+            matches.add(identifier)
+        elif folder == 'assets/midis' and stem.rsplit('-v', 1)[0] == identifier:
+            matches.add(identifier)
+    return matches
+
+
+def regenerate_waveforms(identifiers):
+    """
+    Refresh peak files for tracks whose audio changed, if numpy is installed.
+    tracks.json is not written: it may be open in an editor, whose next save
+    would drop the field again, and the write would wake the watcher itself.
+    """
+    try:
+        from generate_waveforms import generate_waveforms
+    except ImportError as e:
+        print(f"Skipping waveforms ({e})")
+        return
+    generate_waveforms(identifiers, update_tracks=False)
+
+
+def handle_changes(paths, tracks):
+    """Regenerate what depends on paths and return the up-to-date tracks"""
+    pages = set()
+    waveforms = set()
+
+    if any(os.path.normpath(path) == os.path.normpath(TRACKS_FILE) for path in paths):
+        try:
+            new_tracks = load_tracks()
+        except (OSError, json.JSONDecodeError) as e:
+            # Usually a half-saved file; the next write triggers another pass
+            print(f"Could not read {TRACKS_FILE}: {e}")
+            new_tracks = tracks
+        pages |= changed_track_ids(tracks, new_tracks)
+        for identifier in tracks.keys() - new_tracks.keys():
+            print(f"Removed from tracks.json: {identifier} (run find_orphans.py to clean up songs/{identifier}.html)")
+        waveforms |= {identifier for identifier in pages
+                      if tracks.get(identifier, {}).get('previewUrl') != new_tracks[identifier].get('previewUrl')}
+        tracks = new_tracks
+
+    for path in paths:
+        if path.startswith('data'):
+            continue
+        affected = tracks_using_asset(tracks, os.path.relpath(path))
+        pages |= affected
+        if path.endswith('.mp3'):
+            waveforms |= affected
+
+    for identifier in sorted(pages):
+        write_song_page(identifier, tracks[identifier])
+    if waveforms:
+        regenerate_waveforms(sorted(waveforms))
+    return tracks
+
+
+def watch(use_polling=False):
+    """Keep regenerating affected outputs until interrupted"""
+    SONGS_DIR.mkdir(exist_ok=True)
+    tracks = load_tracks()
+    directories = [os.path.dirname(TRACKS_FILE)] + WATCHED_ASSET_DIRS
+
+    watcher = None
+    if not use_polling:
+        try:
+            watcher = InotifyWatcher(directories)
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    if watcher is None:
+        watcher = PollingWatcher(directories)
+
+    print(f"Watching {', '.join(directories)} with {type(watcher).__name__} (Ctrl+C to stop)")
+    missing = [directory for directory in directories if not os.path.isdir(directory)]
+    if missing:
+        print(f"Not created yet, will be watched once they appear: {', '.join(missing)}")
+    try:
+        while True:
+            paths = watcher.wait()
+            if not paths:
+                # Activity in a stand-in parent folder that did not create a watched one
+                continue
+            # Debounce: keep collecting until the burst goes quiet
+            while True:
+                more = watcher.wait(DEBOUNCE_SECONDS)
+                if not more:
+                    break
+                paths |= more
+            started = time.monotonic()
+            tracks = handle_changes(paths, tracks)
+            print(f"Updated in {(time.monotonic() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
 if __name__ == '__main__':
-    generate_song_pages()
+    parser = argparse.ArgumentParser(description="Generate songs/<id>.html pages for Discord embeds.")
+    parser.add_argument('--watch', action='store_true', help="Regenerate affected pages whenever files change")
+    parser.add_argument('--poll', action='store_true', help="With --watch, poll instead of using inotify")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(use_polling=args.poll)
+    else:
+        generate_song_pages()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Precompute waveform peak data for every preview in assets/audio so the players
+can draw scrub bars and visualizers without decoding whole MP3s in the browser.
+Run this script whenever audio files are added or replaced.
+
+Each track gets an <name>.peaks file next to its MP3 and a "waveform" field in
+tracks.json pointing at it. Files whose audio is unchanged are skipped.
+
+Requires ffmpeg on the PATH and numpy.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+TRACKS_FILE = 'data/tracks.json'
+AUDIO_DIR = 'assets/audio'
+
+# Decode rate; peaks do not need full fidelity
+SAMPLE_RATE = 22050
+
+# Samples per min/max pair, from most to least detailed
+ZOOM_LEVELS = (256, 1024, 4096)
+
+# File layout (little endian):
+#   header:  magic, version, level count, sample rate, sha1 of the source MP3
+#   levels:  samples per peak, peak count           (one entry per level)
+#   data:    int8 min/max pairs for each level, in the same order
+MAGIC = b'HVPK'
+VERSION = 1
+HEADER = struct.Struct('<4sBBI20s')
+LEVEL = struct.Struct('<II')
+
+
+def file_hash(path):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def stored_hash(peaks_path):
+    """
+    Return the source hash recorded in an existing peaks file, or None when the
+    file is missing or was written with a different layout or ZOOM_LEVELS.
+    """
+    try:
+        with open(peaks_path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return None
+            magic, version, level_count, sample_rate, digest = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or sample_rate != SAMPLE_RATE:
+                return None
+            if level_count != len(ZOOM_LEVELS):
+                return None
+            table = f.read(LEVEL.size * level_count)
+    except OSError:
+        return None
+    if len(table) < LEVEL.size * level_count:
+        return None
+    stored_levels = tuple(spp for spp, _ in LEVEL.iter_unpack(table))
+    if stored_levels != tuple(ZOOM_LEVELS):
+        return None
+    return digest
+
+
+def decode_audio(path):
+    """Decode an audio file to mono int16 samples with ffmpeg"""
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def compute_peaks(samples, samples_per_peak):
+    """Return interleaved int8 min/max pairs, one pair per block of samples"""
+    blocks = -(-len(samples) // samples_per_peak)
+    padded = np.zeros(blocks * samples_per_peak, dtype=np.int16)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(blocks, samples_per_peak)
+
+    peaks = np.empty((blocks, 2), dtype=np.int16)
+    peaks[:, 0] = frames.min(axis=1)
+    peaks[:, 1] = frames.max(axis=1)
+    # int16 -> int8 keeps the sign and the top 8 bits of magnitude
+    return (peaks >> 8).astype(np.int8).ravel()
+
+
+def build_peaks_file(audio_path, peaks_path, digest):
+    """Decode one audio file and write all zoom levels to peaks_path"""
+    samples = decode_audio(audio_path)
+    levels = [compute_peaks(samples, spp) for spp in ZOOM_LEVELS]
+
+    tmp_path = peaks_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(ZOOM_LEVELS), SAMPLE_RATE, digest))
+        for spp, peaks in zip(ZOOM_LEVELS, levels):
+            f.write(LEVEL.pack(spp, len(peaks) // 2))
+        for peaks in levels:
+            f.write(peaks.tobytes())
+    os.replace(tmp_path, peaks_path)
+
+
+def process_track(job):
+    """Worker: (track_id, audio_path, peaks_path) -> (track_id, status)"""
+    track_id, audio_path, peaks_path = job
+    try:
+        digest = file_hash(audio_path)
+        if stored_hash(peaks_path) == digest:
+            return track_id, 'unchanged'
+        build_peaks_file(audio_path, peaks_path, digest)
+        return track_id, 'generated'
+    except (OSError, subprocess.CalledProcessError) as e:
+        return track_id, f'failed: {e}'
+
+
+def generate_waveforms(track_ids=None, update_tracks=True):
+    """
+    Build peak files for all tracks, or only for the given identifiers. With
+    update_tracks=False, tracks.json is left alone and the tracks whose waveform
+    field is missing or stale are only listed.
+    """
+    with open(TRACKS_FILE, 'r', encoding='utf-8') as f:
+        tracks = json.load(f)
+
+    jobs = []
+    for track_id, track in tracks.items():
+        if track_ids is not None and track_id not in track_ids:
+            continue
+        preview_url = track.get('previewUrl', '')
+        if not preview_url.startswith('/assets/audio/'):
+            continue
+        audio_path = os.path.join(AUDIO_DIR, os.path.basename(preview_url))
+        if not os.path.exists(audio_path):
+            print(f"Missing audio for {track_id}: {audio_path}")
+            continue
+        peaks_path = os.path.splitext(audio_path)[0] + '.peaks'
+        jobs.append((track_id, audio_path, peaks_path))
+
+    outdated = []
+    with ProcessPoolExecutor() as pool:
+        for track_id, status in pool.map(process_track, jobs):
+            print(f"{track_id}: {status}")
+            if status.startswith('failed'):
+                continue
+            peaks_path = os.path.splitext(tracks[track_id]['previewUrl'])[0] + '.peaks'
+            if tracks[track_id].get('waveform') != peaks_path:
+                tracks[track_id]['waveform'] = peaks_path
+                outdated.append(track_id)
+
+    if outdated and not update_tracks:
+        print(f"\nRun generate_waveforms.py to set the waveform field for: {', '.join(sorted(outdated))}")
+    elif outdated:
+        with open(TRACKS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(tracks, f, indent=2, ensure_ascii=False)
+        print(f"\nUpdated waveform fields in {TRACKS_FILE}")
+
+    print(f"\nProcessed {len(jobs)} tracks.")
+
+
+if __name__ == '__main__':
+    generate_waveforms()
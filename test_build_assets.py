@@ -0,0 +1,149 @@
+"""
+Tests for the JS minifier in build_assets.py. Run from the repository root:
+
+    python -m unittest test_build_assets
+"""
+
+import glob
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from build_assets import build_page, minify_js
+
+
+TEMPLATE_SOURCE = '''function card(track) {
+    // Indentation and blank lines inside the template are part of the string
+    return `
+        <div class="card">
+
+            <h2>${track.title}</h2>
+            ${track.tags.map(tag => {
+                return `<span>  ${tag}  </span>`;
+            }).join('')}
+        </div>
+    `;
+}
+'''
+
+# Literal text of the templates above; the code inside ${...} is minified as usual
+TEMPLATE_TEXT = [
+    '`\n        <div class="card">\n\n            <h2>${',
+    '}</h2>\n            ${',
+    '`<span>  ${',
+    '}  </span>`',
+    '}\n        </div>\n    `',
+]
+
+
+class MinifyJsTest(unittest.TestCase):
+    def test_template_literal_is_copied_verbatim(self):
+        minified = minify_js(TEMPLATE_SOURCE)
+        for text in TEMPLATE_TEXT:
+            self.assertIn(text, minified)
+
+    def test_code_whitespace_and_comments_are_removed(self):
+        source = '  let a = 1;   /* note */  \n\n\n    // gone\n    let b = "  x  " + /  y /.source;\n'
+        self.assertEqual(minify_js(source), 'let a = 1;\nlet b = "  x  " + /  y /.source;\n')
+
+    def test_line_breaks_are_kept_for_semicolon_insertion(self):
+        source = 'let a = b\n  /* spans\n  lines */ (c)\n'
+        self.assertEqual(minify_js(source), 'let a = b\n(c)\n')
+
+    def test_regex_literals_stop_at_the_end_of_the_line(self):
+        # After "}" a "/" may start a regex, but one cannot run into the next line
+        source = 'let n = function () {} / 2\nlet s = "it\'s / ok"  // c\n'
+        self.assertEqual(minify_js(source), 'let n = function () {} / 2\nlet s = "it\'s / ok"\n')
+
+    def test_property_named_like_a_keyword_is_divided(self):
+        source = 'let x = range.in / 2; // it\'s\nlet y = 3 / 4; // "\n'
+        self.assertEqual(minify_js(source), 'let x = range.in / 2;\nlet y = 3 / 4;\n')
+
+    def test_division_after_increment_is_not_a_regex(self):
+        source = 'let x = i++ / 2; // c\nlet y = j-- / 4; // it\'s\n'
+        self.assertEqual(minify_js(source), 'let x = i++ / 2;\nlet y = j-- / 4;\n')
+
+    def test_regex_literals_are_copied_verbatim(self):
+        source = 'if (/a[/]b\\/ c/g.test(s)) return /  x  /; // c\n'
+        self.assertEqual(minify_js(source), 'if (/a[/]b\\/ c/g.test(s)) return /  x  /;\n')
+
+    def test_minified_is_idempotent(self):
+        minified = minify_js(TEMPLATE_SOURCE)
+        self.assertEqual(minify_js(minified), minified)
+
+    @unittest.skipIf(shutil.which('node') is None, "node is not installed")
+    def test_minified_template_renders_the_same(self):
+        # Round trip: the minified function must build exactly the same markup
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        call = "\nprocess.stdout.write(card({title: 'T', tags: ['a', 'b']}));\n"
+        outputs = []
+        for name, code in (('source.js', TEMPLATE_SOURCE), ('minified.js', minify_js(TEMPLATE_SOURCE))):
+            path = os.path.join(directory, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code + call)
+            outputs.append(subprocess.run(['node', path], capture_output=True, text=True, check=True).stdout)
+        self.assertEqual(outputs[0], outputs[1])
+
+    @unittest.skipIf(shutil.which('node') is None, "node is not installed")
+    def test_site_scripts_still_parse(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for source in glob.glob('assets/js/*.js'):
+            with open(source, 'r', encoding='utf-8') as f:
+                minified = minify_js(f.read())
+            path = os.path.join(directory, os.path.basename(source))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(minified)
+            result = subprocess.run(['node', '--check', path], capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, f"{source}: {result.stderr}")
+
+
+class BuildPageScriptsTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.addCleanup(shutil.rmtree, self.output)
+
+    def build(self, body):
+        for name in 'abcde':
+            with open(os.path.join(self.root, f'{name}.js'), 'w', encoding='utf-8') as f:
+                f.write(f'window.{name} = 1;\n')
+        with open(os.path.join(self.root, 'page.html'), 'w', encoding='utf-8') as f:
+            f.write(f'<html><head>\n{body}</head><body></body></html>\n')
+        build_page(self.root, self.output, 'page.html', 'assets/dist/font.woff2')
+        with open(os.path.join(self.output, 'page.html'), encoding='utf-8') as f:
+            html = f.read()
+        return re.findall(r'<script[^>]*>', html)
+
+    def bundle(self, tag):
+        src = re.search(r'src="([^"]+)"', tag).group(1)
+        with open(os.path.join(self.output, src), encoding='utf-8') as f:
+            return f.read()
+
+    def test_scripts_are_bundled_by_loading_attributes(self):
+        tags = self.build(
+            '    <script src="a.js"></script>\n'
+            '    <script src="b.js" defer></script>\n'
+            '    <script src="c.js"></script>\n'
+            '    <script type="module" src="d.js"></script>\n'
+            '    <script src="e.js" async></script>\n'
+        )
+        self.assertEqual(len(tags), 4)
+        blocking, deferred, module, asynchronous = tags
+        self.assertNotIn('defer', blocking)
+        self.assertEqual(self.bundle(blocking), 'window.a = 1;\nwindow.c = 1;\n')
+        self.assertTrue(deferred.endswith(' defer>'))
+        self.assertEqual(self.bundle(deferred), 'window.b = 1;\n')
+        self.assertIn('type="module"', module)
+        self.assertEqual(self.bundle(module), 'window.d = 1;\n')
+        self.assertTrue(asynchronous.endswith(' async>'))
+        self.assertEqual(self.bundle(asynchronous), 'window.e = 1;\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
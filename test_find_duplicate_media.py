@@ -0,0 +1,65 @@
+"""
+Tests for the LSH candidate selection in find_duplicate_media.py. Run from the
+repository root:
+
+    python -m unittest test_find_duplicate_media
+"""
+
+import unittest
+
+try:
+    import numpy as np
+    import find_duplicate_media as dupes
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class CandidatePairsTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(5)
+
+    def random_video(self):
+        return self.rng.integers(0, 2 ** 63, dupes.VIDEO_MAX_FRAMES, dtype=np.int64).astype(np.uint64)
+
+    def reencode(self, frame_hashes, flips=3):
+        """Flip a few bits in every frame hash, like a re-encode of the same video"""
+        noisy = frame_hashes.copy()
+        for i in range(len(noisy)):
+            for bit in self.rng.choice(64, flips, replace=False):
+                noisy[i] ^= np.uint64(1) << np.uint64(int(bit))
+        return noisy
+
+    def random_audio(self):
+        vector = self.rng.standard_normal(dupes.TIME_SEGMENTS * (12 + dupes.SPECTRAL_BANDS))
+        return vector / np.linalg.norm(vector)
+
+    def test_unrelated_videos_are_mostly_pruned(self):
+        count = 40
+        fingerprints = [('video', str(i), self.random_video()) for i in range(count)]
+        all_pairs = count * (count - 1) // 2
+        self.assertLess(len(dupes.candidate_pairs(fingerprints)), all_pairs // 5)
+
+    def test_unrelated_audio_is_mostly_pruned(self):
+        count = 40
+        fingerprints = [('audio', str(i), self.random_audio()) for i in range(count)]
+        all_pairs = count * (count - 1) // 2
+        self.assertLess(len(dupes.candidate_pairs(fingerprints)), all_pairs // 5)
+
+    def test_reencoded_video_is_a_matching_candidate(self):
+        original = self.random_video()
+        copy = self.reencode(original)
+        fingerprints = [('video', 'a', original), ('video', 'b', copy)]
+        self.assertIn((0, 1), dupes.candidate_pairs(fingerprints))
+        self.assertTrue(dupes.video_match(original, copy))
+
+    def test_flat_frames_do_not_link_unrelated_videos(self):
+        first, second = self.random_video(), self.random_video()
+        first[:8] = 0
+        second[:8] = 0
+        self.assertFalse(dupes.video_match(first, second))
+        self.assertEqual(dupes.video_vector(first)[:8 * 64].any(), False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Estimate tempo and key from the audio in assets/audio and flag tracks whose
+hand-entered "bpm" or "key" in tracks.json disagree.
+
+Results are cached by audio hash in .audio_analysis_cache.json, so only new
+or replaced audio is analysed again.
+
+Requires ffmpeg on the PATH and numpy.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from generate_waveforms import AUDIO_DIR, SAMPLE_RATE, decode_audio, file_hash
+
+CACHE_FILE = '.audio_analysis_cache.json'
+
+# Bump when the analysis changes so stale cache entries are recomputed
+ANALYSIS_VERSION = 1
+
+# Onset envelope
+ONSET_FRAME = 2048
+ONSET_HOP = 512
+MIN_BPM = 60
+MAX_BPM = 200
+
+# Chroma for key detection
+CHROMA_FRAME = 8192
+CHROMA_HOP = 4096
+
+PITCH_NAMES = ['C', 'C#', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B']
+PITCH_ALIASES = {'Db': 'C#', 'D#': 'Eb', 'Gb': 'F#', 'G#': 'Ab', 'A#': 'Bb'}
+
+# Krumhansl-Kessler key profiles, starting at the tonic
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+
+def frame_spectrum(samples, frame_size, hop):
+    """Magnitude spectrum of overlapping Hann-windowed frames, one row per frame"""
+    if len(samples) < frame_size:
+        return np.zeros((0, frame_size // 2 + 1))
+    frames = sliding_window_view(samples, frame_size)[::hop]
+    window = np.hanning(frame_size).astype(np.float32)
+    # Transform in blocks so a full-length song does not need hundreds of MB at once
+    block = 512
+    return np.vstack([
+        np.abs(np.fft.rfft(frames[start:start + block] * window, axis=1)).astype(np.float32)
+        for start in range(0, len(frames), block)
+    ])
+
+
+def estimate_tempo(samples):
+    """BPM from the autocorrelation of a spectral-flux onset envelope"""
+    spectrum = np.log1p(frame_spectrum(samples, ONSET_FRAME, ONSET_HOP))
+    flux = np.maximum(np.diff(spectrum, axis=0), 0).sum(axis=1)
+    if len(flux) < 2:
+        return None
+
+    # Remove the slowly varying loudness so only onsets remain
+    window = 16
+    baseline = np.convolve(flux, np.ones(window) / window, mode='same')
+    envelope = np.maximum(flux - baseline, 0)
+    envelope -= envelope.mean()
+
+    size = 1 << int(np.ceil(np.log2(2 * len(envelope))))
+    spectrum = np.fft.rfft(envelope, size)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum))[:len(envelope)]
+
+    frames_per_minute = 60 * SAMPLE_RATE / ONSET_HOP
+    lags = np.arange(int(frames_per_minute / MAX_BPM), int(frames_per_minute / MIN_BPM) + 1)
+    lags = lags[lags < len(autocorr)]
+    if not len(lags):
+        return None
+
+    # Mild preference for tempos around 120 BPM to settle half/double ambiguity
+    bpms = frames_per_minute / lags
+    weights = np.exp(-0.5 * (np.log2(bpms / 120)) ** 2)
+    best = int(lags[np.argmax(autocorr[lags] * weights)])
+
+    # One lag step is several BPM at this hop size; refine with a parabola through the peak
+    if 0 < best < len(autocorr) - 1:
+        left, centre, right = autocorr[best - 1:best + 2]
+        curvature = left - 2 * centre + right
+        if curvature < 0:
+            best += 0.5 * (left - right) / curvature
+    return round(float(frames_per_minute / best), 1)
+
+
+def estimate_key(samples):
+    """Best matching major/minor key for the track's overall chroma"""
+    spectrum = frame_spectrum(samples, CHROMA_FRAME, CHROMA_HOP)
+    if not len(spectrum):
+        return None
+
+    freqs = np.fft.rfftfreq(CHROMA_FRAME, 1 / SAMPLE_RATE)
+    audible = np.flatnonzero((freqs >= 55) & (freqs <= 2000))
+    pitch_class = (np.round(12 * np.log2(freqs[audible] / 440.0)).astype(int) + 9) % 12
+    chroma = np.bincount(pitch_class, weights=spectrum[:, audible].sum(axis=0), minlength=12)
+
+    # One row per candidate key: 12 major rotations then 12 minor rotations
+    templates = np.array([np.roll(profile, tonic) for profile in (MAJOR_PROFILE, MINOR_PROFILE) for tonic in range(12)])
+    templates = (templates - templates.mean(axis=1, keepdims=True)) / templates.std(axis=1, keepdims=True)
+    chroma = (chroma - chroma.mean()) / (chroma.std() + 1e-9)
+
+    best = int(np.argmax(templates @ chroma))
+    mode = 'Major' if best < 12 else 'Minor'
+    return f"{PITCH_NAMES[best % 12]} {mode}"
+
+
+def analyse(job):
+    """Worker: (digest, audio_path) -> (digest, result or None)"""
+    digest, audio_path = job
+    try:
+        samples = decode_audio(audio_path).astype(np.float32)
+    except Exception as e:
+        print(f"Could not decode {audio_path}: {e}")
+        return digest, None
+    return digest, {
+        'version': ANALYSIS_VERSION,
+        'bpm': estimate_tempo(samples),
+        'key': estimate_key(samples),
+    }
+
+
+def normalize_key(key):
+    """'F# Minor' / 'Gb minor' -> ('F#', 'Minor'); None if it cannot be parsed"""
+    parts = str(key or '').split()
+    if len(parts) != 2:
+        return None
+    tonic = PITCH_ALIASES.get(parts[0], parts[0])
+    mode = parts[1].capitalize()
+    if tonic not in PITCH_NAMES or mode not in ('Major', 'Minor'):
+        return None
+    return tonic, mode
+
+
+def bpm_matches(stored, estimated, tolerance):
+    """Within tolerance, also accepting the half/double tempo an estimator commonly reports"""
+    return any(abs(stored - estimated * factor) <= tolerance for factor in (0.5, 1, 2))
+
+
+def load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(cache):
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+
+
+def verify_tracks(tracks_file, bpm_tolerance):
+    """Return a list of (track_id, problems, result) for tracks that disagree with their audio"""
+    with open(tracks_file, 'r', encoding='utf-8') as f:
+        tracks = json.load(f)
+
+    cache = load_cache()
+    audio_for_track = {}
+    jobs = {}
+    for track_id, track in tracks.items():
+        preview_url = track.get('previewUrl', '')
+        audio_path = os.path.join(AUDIO_DIR, os.path.basename(preview_url))
+        if not preview_url.endswith('.mp3') or not os.path.exists(audio_path):
+            print(f"No audio for {track_id}, skipping")
+            continue
+        digest = file_hash(audio_path).hex()
+        audio_for_track[track_id] = digest
+        if cache.get(digest, {}).get('version') != ANALYSIS_VERSION:
+            jobs[digest] = audio_path
+
+    if jobs:
+        print(f"Analysing {len(jobs)} audio files ({len(audio_for_track) - len(jobs)} cached)...")
+        with ProcessPoolExecutor() as pool:
+            for digest, result in pool.map(analyse, jobs.items()):
+                if result:
+                    cache[digest] = result
+        save_cache(cache)
+
+    flagged = []
+    for track_id, digest in audio_for_track.items():
+        result = cache.get(digest)
+        if not result:
+            continue
+        track = tracks[track_id]
+        problems = []
+
+        stored_bpm = track.get('bpm')
+        if result['bpm'] and isinstance(stored_bpm, (int, float)) and not bpm_matches(stored_bpm, result['bpm'], bpm_tolerance):
+            problems.append(f"bpm {stored_bpm} vs estimated {result['bpm']}")
+
+        stored_key = track.get('key')
+        if result['key'] and normalize_key(stored_key) != normalize_key(result['key']):
+            problems.append(f"key '{stored_key}' vs estimated '{result['key']}'")
+
+        if problems:
+            flagged.append((track_id, problems, result))
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check tracks.json bpm/key values against the audio.")
+    parser.add_argument('--tracks', default='data/tracks.json', help="Tracks file to verify (default: data/tracks.json)")
+    parser.add_argument('--bpm-tolerance', type=float, default=2.0, help="Allowed BPM difference (default: 2)")
+    args = parser.parse_args()
+
+    flagged = verify_tracks(args.tracks, args.bpm_tolerance)
+    for track_id, problems, _ in flagged:
+        print(f"{track_id}: {'; '.join(problems)}")
+
+    if flagged:
+        print(f"\n{len(flagged)} tracks disagree with their audio.")
+        sys.exit(1)
+    print("\nAll analysed tracks match their stored bpm and key.")
+
+
+if __name__ == '__main__':
+    main()